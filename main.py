@@ -1,162 +1,237 @@
 import sys
-from collections import deque, OrderedDict
+import os
+import mmap
 import time
 import argparse
 import heapq
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from array import array
+from itertools import compress
+from operator import itemgetter
+
+HEX_DIGITS = b'0123456789abcdefABCDEF'
+OP_READ, OP_WRITE = 0, 1
+OPERATION_CODES = {'R': OP_READ, 'W': OP_WRITE}
+OPERATION_BYTES = bytes.maketrans(b'RW', bytes([OP_READ, OP_WRITE]))
 
 class MemorySimulator:
     def __init__(self, frame_count, replacement_policy):
         self.frame_count = frame_count
         self.replacement_policy = replacement_policy.lower()
         self.page_table = {}  
-        self.frame_table = {}  
-        self.dirty_pages = set()
+        self.frame_page = [-1] * frame_count
+        self.frame_dirty = bytearray(frame_count)
         self.page_faults = 0
         self.disk_writes = 0
         self.replacements = 0
         self.hits = 0
         self.total_accesses = 0
-        self.operation_stats = {'R': 0, 'W': 0}
+        self.writes = 0
         self.page_access_frequency = {}
+        self.top_pages = []
         self.start_time = time.time()
+        self._on_hit = self._on_noop
+        self._on_load = self._on_noop
+        self._select_victim = self._victim_first_frame
 
         if self.replacement_policy == 'fifo':
-            self.fifo_queue = deque()
+            self.fifo_hand = 0
+            self._select_victim = self._victim_fifo
         elif self.replacement_policy == 'lru':
-            self.lru_cache = OrderedDict()
+            self.lru_prev = [-1] * frame_count
+            self.lru_next = [-1] * frame_count
+            self.lru_head = -1
+            self.lru_tail = -1
+            self._on_hit = self._hit_lru
+            self._on_load = self._load_lru
+            self._select_victim = self._victim_lru
         elif self.replacement_policy == 'opt':
-            self.opt_future_refs = {}   
-            self.next_ref = {} 
+            self.opt_next_use = []
+            self.opt_heap = []
+            self.opt_entries = {}
+            self._on_hit = self._hit_opt
+            self._on_load = self._load_opt
+            self._select_victim = self._victim_opt
 
     def load_trace_file(self, filename):
-        references = []
         try:
-            with open(filename, 'r') as f:
-                for line_num, line in enumerate(f):
-                    parts = line.strip().split()
-                    if len(parts) == 2:
-                        try:
-                            address = int(parts[0], 16)
-                            operation = parts[1]
-                            page_num = address >> 12
-                            references.append((page_num, operation))
-                            self.page_access_frequency[page_num] = self.page_access_frequency.get(page_num, 0) + 1
-                        except ValueError:
-                            continue
-            
-            if self.replacement_policy == 'opt':
-                self._preprocess_opt_references(references)
-            
-            return references
+            pages, operations, page_access_frequency = parse_trace(filename)
         except FileNotFoundError:
             print(f"Error: No se pudo encontrar el archivo {filename}")
             sys.exit(1)
 
-    def _preprocess_opt_references(self, references):
-        page_positions = {}
-        for pos, (page_num, _) in enumerate(references):
-            if page_num not in page_positions:
-                page_positions[page_num] = []
-            page_positions[page_num].append(pos)
-        
-        for page_num in page_positions:
-            positions = page_positions[page_num]
-            heapq.heapify(positions)
-            self.opt_future_refs[page_num] = positions
-        
-        self.next_ref = {}
-        for page_num in self.opt_future_refs:
-            if self.opt_future_refs[page_num]:
-                self.next_ref[page_num] = heapq.heappop(self.opt_future_refs[page_num])
-
-    def simulate(self, references):
-        for current_pos, (page_num, operation) in enumerate(references):
-            self.total_accesses += 1
-            self.operation_stats[operation] += 1
-            
-            if self.replacement_policy == 'opt':
-                self._update_opt_next_ref(page_num, current_pos)
-            
-            if page_num in self.page_table:
-                self.hits += 1
-                frame_num = self.page_table[page_num]
-                
-                if self.replacement_policy == 'lru':
-                    self.lru_cache.move_to_end(page_num)
+        self.load_references(pages, page_access_frequency)
+        return pages, operations
+
+    def load_references(self, pages, page_access_frequency, top_pages=None, next_use=None):
+        self.page_access_frequency = page_access_frequency
+        if top_pages is None:
+            top_pages = most_accessed_pages(page_access_frequency)
+        self.top_pages = top_pages
+        if self.replacement_policy == 'opt':
+            if next_use is None:
+                next_use = build_next_use(pages)
+            self.opt_next_use = next_use
+
+    def simulate(self, pages, operations):
+        if self.replacement_policy == 'opt' and len(self.opt_next_use) < len(pages):
+            self.opt_next_use = build_next_use(pages)
+        self.writes += operations.count(OP_WRITE)
+        if self.total_accesses == 0:
+            resident = dict.fromkeys(pages)
+            if len(resident) <= self.frame_count:
+                self._load_working_set(pages, operations, resident)
+                return
+
+        page_table = self.page_table
+        frame_dirty = self.frame_dirty
+        on_hit = self._on_hit
+        handle_page_fault = self._handle_page_fault
+        hits = 0
+
+        for current_pos, (page_num, operation) in enumerate(zip(pages, operations)):
+            frame_num = page_table.get(page_num)
+            if frame_num is not None:
+                hits += 1
+                on_hit(page_num, frame_num, current_pos)
                 
-                if operation == 'W':
-                    self.frame_table[frame_num]['dirty'] = True
-                    self.dirty_pages.add(page_num)
+                if operation:
+                    frame_dirty[frame_num] = 1
             else:
-                self.page_faults += 1
-                self._handle_page_fault(page_num, operation, current_pos)
+                handle_page_fault(page_num, operation, current_pos)
 
-    def _update_opt_next_ref(self, page_num, current_pos):
-        if page_num in self.next_ref and current_pos == self.next_ref[page_num]:
-            if page_num in self.opt_future_refs and self.opt_future_refs[page_num]:
-                self.next_ref[page_num] = heapq.heappop(self.opt_future_refs[page_num])
-            else:
-                self.next_ref[page_num] = None
+        self.total_accesses += len(pages)
+        self.hits += hits
+        self.page_faults += len(pages) - hits
+
+    def _load_working_set(self, pages, operations, resident):
+        for frame_num, page_num in enumerate(resident):
+            self.page_table[page_num] = frame_num
+            self.frame_page[frame_num] = page_num
+        for page_num in set(compress(pages, operations)):
+            self.frame_dirty[self.page_table[page_num]] = 1
+
+        if self.replacement_policy == 'lru':
+            for page_num in reversed(dict.fromkeys(reversed(pages))):
+                self._lru_append(self.page_table[page_num])
+        elif self.replacement_policy == 'opt':
+            first_seen = dict(zip(reversed(pages), range(len(pages) - 1, -1, -1)))
+            last_seen = dict(zip(pages, range(len(pages))))
+            for page_num in resident:
+                self._push_opt_entry(page_num, first_seen[page_num], last_seen[page_num])
+
+        self.total_accesses = len(pages)
+        self.page_faults = len(resident)
+        self.hits = len(pages) - len(resident)
+
+    def _push_opt_entry(self, page_num, loaded_at, current_pos):
+        entry = (-self.opt_next_use[current_pos], loaded_at, page_num)
+        self.opt_entries[page_num] = entry
+        heapq.heappush(self.opt_heap, entry)
+
+        if len(self.opt_heap) > 4 * self.frame_count + 1024:
+            self.opt_heap = list(self.opt_entries.values())
+            heapq.heapify(self.opt_heap)
 
     def _handle_page_fault(self, page_num, operation, current_pos):
-        if len(self.page_table) < self.frame_count:
-            frame_num = len(self.page_table)
+        page_table = self.page_table
+        frame_page = self.frame_page
+        frame_dirty = self.frame_dirty
+        
+        if len(page_table) < self.frame_count:
+            frame_num = len(page_table)
         else:
             self.replacements += 1
-            frame_num = self._select_victim_frame(current_pos)
-            victim_page = self.frame_table[frame_num]['page_num']
+            frame_num = self._select_victim(current_pos)
             
-            if self.frame_table[frame_num]['dirty']:
+            if frame_dirty[frame_num]:
                 self.disk_writes += 1
             
-            del self.page_table[victim_page]
-            if victim_page in self.dirty_pages:
-                self.dirty_pages.remove(victim_page)
-            
-            if self.replacement_policy == 'lru' and victim_page in self.lru_cache:
-                del self.lru_cache[victim_page]
-        
-        self.page_table[page_num] = frame_num
-        self.frame_table[frame_num] = {
-            'page_num': page_num,
-            'dirty': (operation == 'W')
-        }
+            del page_table[frame_page[frame_num]]
         
-        if operation == 'W':
-            self.dirty_pages.add(page_num)
+        page_table[page_num] = frame_num
+        frame_page[frame_num] = page_num
+        frame_dirty[frame_num] = operation
         
-        if self.replacement_policy == 'fifo':
-            self.fifo_queue.append(page_num)
-        elif self.replacement_policy == 'lru':
-            self.lru_cache[page_num] = frame_num
+        self._on_load(page_num, frame_num, current_pos)
 
-    def _select_victim_frame(self, current_pos):
-        if self.replacement_policy == 'fifo':
-            victim_page = self.fifo_queue.popleft()
-            return self.page_table[victim_page]
+    def _lru_unlink(self, frame_num):
+        prev_frame = self.lru_prev[frame_num]
+        next_frame = self.lru_next[frame_num]
+        if prev_frame == -1:
+            self.lru_head = next_frame
+        else:
+            self.lru_next[prev_frame] = next_frame
+        if next_frame == -1:
+            self.lru_tail = prev_frame
+        else:
+            self.lru_prev[next_frame] = prev_frame
+
+    def _lru_append(self, frame_num):
+        self.lru_prev[frame_num] = self.lru_tail
+        self.lru_next[frame_num] = -1
+        if self.lru_tail == -1:
+            self.lru_head = frame_num
+        else:
+            self.lru_next[self.lru_tail] = frame_num
+        self.lru_tail = frame_num
+
+    def _on_noop(self, page_num, frame_num, current_pos):
+        pass
+
+    def _hit_lru(self, page_num, frame_num, current_pos):
+        tail = self.lru_tail
+        if frame_num == tail:
+            return
         
-        elif self.replacement_policy == 'lru':
-            victim_page, _ = self.lru_cache.popitem(last=False)
-            return self.page_table[victim_page]
+        lru_prev = self.lru_prev
+        lru_next = self.lru_next
+        prev_frame = lru_prev[frame_num]
+        next_frame = lru_next[frame_num]
+        if prev_frame == -1:
+            self.lru_head = next_frame
+        else:
+            lru_next[prev_frame] = next_frame
+        lru_prev[next_frame] = prev_frame
         
-        elif self.replacement_policy == 'opt':
-            victim_page = None
-            farthest_next_use = -1
-            
-            for page in self.page_table:
-                next_use = self.next_ref.get(page, None)
-                
-                if next_use is None:
-                    return self.page_table[page]
-                
-                if next_use > farthest_next_use:
-                    farthest_next_use = next_use
-                    victim_page = page
-            
-            return self.page_table[victim_page] if victim_page is not None else 0
+        lru_prev[frame_num] = tail
+        lru_next[frame_num] = -1
+        lru_next[tail] = frame_num
+        self.lru_tail = frame_num
+
+    def _load_lru(self, page_num, frame_num, current_pos):
+        self._lru_append(frame_num)
+
+    def _hit_opt(self, page_num, frame_num, current_pos):
+        self._push_opt_entry(page_num, self.opt_entries[page_num][1], current_pos)
+
+    def _load_opt(self, page_num, frame_num, current_pos):
+        self._push_opt_entry(page_num, current_pos, current_pos)
+
+    def _victim_fifo(self, current_pos):
+        frame_num = self.fifo_hand
+        self.fifo_hand = (frame_num + 1) % self.frame_count
+        return frame_num
+
+    def _victim_lru(self, current_pos):
+        frame_num = self.lru_head
+        self._lru_unlink(frame_num)
+        return frame_num
+
+    def _victim_opt(self, current_pos):
+        while self.opt_heap:
+            entry = heapq.heappop(self.opt_heap)
+            victim_page = entry[2]
+            if self.opt_entries.get(victim_page) is entry:
+                del self.opt_entries[victim_page]
+                return self.page_table[victim_page]
         
         return 0
 
+    def _victim_first_frame(self, current_pos):
+        return 0
+
     def get_stats(self):
         if self.total_accesses == 0:
             return {}
@@ -176,14 +251,104 @@ class MemorySimulator:
             'fault_rate': fault_rate,
             'eat': eat,
             'execution_time': execution_time,
-            'reads': self.operation_stats['R'],
-            'writes': self.operation_stats['W'],
+            'reads': self.total_accesses - self.writes,
+            'writes': self.writes,
             'frames': self.frame_count,
             'policy': self.replacement_policy.upper(),
             'trace_file': getattr(self, 'trace_file', ''),
-            'top_pages': sorted(self.page_access_frequency.items(), key=lambda x: x[1], reverse=True)[:20]
+            'top_pages': self.top_pages
         }
 
+def parse_trace(filename):
+    with open(filename, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return array('Q'), b'', Counter()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            parsed = _parse_fixed_width(data)
+            if parsed is None:
+                parsed = _parse_lines(data[:].decode())
+
+    pages, operations = parsed
+    return pages, operations, Counter(pages)
+
+def build_next_use(pages):
+    never = len(pages)
+    next_use = array('q', [never]) * never
+    last_seen = {}
+    for pos in range(never - 1, -1, -1):
+        page_num = pages[pos]
+        next_use[pos] = last_seen.get(page_num, never)
+        last_seen[page_num] = pos
+    return next_use
+
+def most_accessed_pages(page_access_frequency, count=20):
+    return heapq.nlargest(count, page_access_frequency.items(), key=itemgetter(1))
+
+def _parse_fixed_width(data):
+    addr_width = data.find(b' ')
+    stride = addr_width + 3
+    if addr_width < 4 or addr_width - 3 > 16 or data.find(b'\n') != stride - 1:
+        return None
+
+    size = len(data)
+    newline_at_end = data[size - 1:] == b'\n'
+    if not newline_at_end:
+        size += 1
+    if size % stride:
+        return None
+
+    count = size // stride
+    if data[stride - 1::stride].count(b'\n') != count - (not newline_at_end):
+        return None
+    if data[addr_width::stride].count(b' ') != count:
+        return None
+    operations = data[addr_width + 1::stride]
+    if operations.translate(None, b'RW'):
+        return None
+    for col in range(addr_width):
+        if data[col::stride].translate(None, HEX_DIGITS):
+            return None
+
+    page_digits = addr_width - 3
+    if page_digits <= 8:
+        width, typecode = 8, 'I'
+    else:
+        width, typecode = 16, 'Q'
+    hex_pages = bytearray(b'0' * (width * count))
+    for col in range(page_digits):
+        hex_pages[width - page_digits + col::width] = data[col::stride]
+
+    page_nums = array(typecode)
+    page_nums.frombytes(bytes.fromhex(hex_pages.decode('ascii')))
+    if sys.byteorder == 'little':
+        page_nums.byteswap()
+
+    return page_nums, operations.translate(OPERATION_BYTES)
+
+def _parse_lines(content):
+    pages = array('Q')
+    operations = bytearray()
+    for line in content.splitlines():
+        parts = line.strip().split()
+        if len(parts) == 2:
+            try:
+                address = int(parts[0], 16)
+                operation = OPERATION_CODES[parts[1]]
+                page_num = address >> 12
+            except (ValueError, KeyError):
+                continue
+            pages.append(page_num)
+            operations.append(operation)
+    return pages, bytes(operations)
+
+def _write_lines(lines):
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+def _page_rows(pages, total_accesses):
+    return [f"0x{page:08X}{'':<7} {count:>12,} {(count / total_accesses) * 100:>14.2f}%"
+            for page, count in pages]
+
 def print_individual_report(result):
     print(f"\n{'='*80}")
     print(f"REPORTE INDIVIDUAL - {result['policy']} con {result['frames']} marcos")
@@ -207,40 +372,60 @@ def print_individual_report(result):
     print("\nTOP 10 PÁGINAS MÁS ACCEDIDAS:")
     print(f"{'Página':<15} {'Accesos':>12} {'% del total':>15}")
     print("-"*42)
-    for page, count in result['top_pages'][:10]:
-        pct = (count / result['total_accesses']) * 100
-        print(f"0x{page:08X}{'':<7} {count:>12,} {pct:>14.2f}%")
+    _write_lines(_page_rows(result['top_pages'][:10], result['total_accesses']))
     print(f"{'='*80}\n")
 
-def run_simulations(trace_files, frame_counts, policies):
-    all_results = []
+_worker_traces = {}
+
+def _init_worker(traces):
+    global _worker_traces
+    _worker_traces = traces
+
+def _run_one(trace_file, frames, policy):
+    pages, operations, page_access_frequency, top_pages, next_use = _worker_traces[trace_file]
+    simulator = MemorySimulator(frames, policy)
+    simulator.trace_file = trace_file
+    simulator.load_references(pages, page_access_frequency, top_pages, next_use)
+    simulator.simulate(pages, operations)
+    return simulator.get_stats()
+
+def run_simulations(trace_files, frame_counts, policies, workers=None):
+    traces = {}
+    loaded_files = []
+    needs_next_use = any(policy.lower() == 'opt' for policy in policies)
     
     for trace_file in trace_files:
         print(f"\nProcesando archivo: {trace_file}")
         
         try:
-            with open(trace_file, 'r') as f:
-                total_lines = sum(1 for _ in f)
-            print(f"Total referencias: {total_lines:,}")
+            if trace_file not in traces:
+                pages, operations, page_access_frequency = parse_trace(trace_file)
+                top_pages = most_accessed_pages(page_access_frequency)
+                next_use = build_next_use(pages) if needs_next_use else None
+                traces[trace_file] = (pages, operations, page_access_frequency, top_pages, next_use)
+            print(f"Total referencias: {len(traces[trace_file][0]):,}")
+            loaded_files.append(trace_file)
         except FileNotFoundError:
             print("Error: Archivo no encontrado")
             continue
-        
-        for frames in frame_counts:
-            for policy in policies:
-                print(f"\nEjecutando {policy.upper()} con {frames} marcos...", end='', flush=True)
-                
-                simulator = MemorySimulator(frames, policy)
-                simulator.trace_file = trace_file
-                references = simulator.load_trace_file(trace_file)
-                
-                simulator.simulate(references)
-                stats = simulator.get_stats()
-                all_results.append(stats)
-                
-                print(" Completado")
     
-    return all_results
+    configs = [(trace_file, frames, policy)
+               for trace_file in loaded_files
+               for frames in frame_counts
+               for policy in policies]
+    if not configs:
+        return []
+    
+    print(f"\nEjecutando {len(configs)} simulaciones...")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(traces,)) as executor:
+        futures = {executor.submit(_run_one, *config): config for config in configs}
+        
+        for future in as_completed(futures):
+            trace_file, frames, policy = futures[future]
+            future.result()
+            print(f"- {policy.upper()} con {frames} marcos ({trace_file}) Completado")
+        
+        return [future.result() for future in futures]
 
 def print_final_report(results):
     if not results:
@@ -258,29 +443,26 @@ def print_final_report(results):
           f"{'Reemplazos':>12} {'Escrituras':>12} {'Hit Rate':>10} {'EAT (ns)':>12} {'Tiempo (s)':>10}")
     print("="*120)
     
-    for res in results:
-        print(f"{res['trace_file'][:15]:<15} {res['frames']:>8} {res['policy']:>10} "
-              f"{res['total_accesses']:>12,} {res['hits']:>10,} {res['page_faults']:>12,} "
-              f"{res['replacements']:>12,} {res['disk_writes']:>12,} {res['hit_rate']:>9.2f}% "
-              f"{res['eat']:>12.2f} {res['execution_time']:>10.2f}")
+    _write_lines([f"{res['trace_file'][:15]:<15} {res['frames']:>8} {res['policy']:>10} "
+                  f"{res['total_accesses']:>12,} {res['hits']:>10,} {res['page_faults']:>12,} "
+                  f"{res['replacements']:>12,} {res['disk_writes']:>12,} {res['hit_rate']:>9.2f}% "
+                  f"{res['eat']:>12.2f} {res['execution_time']:>10.2f}"
+                  for res in results])
     
     print("\n\nPáginas más accedidas (combinado):")
     print("="*60)
     print(f"{'Página':<15} {'Accesos':>12} {'% del total':>15}")
     print("="*60)
     
-    combined_accesses = {}
+    combined_accesses = Counter()
     total_all_accesses = sum(r['total_accesses'] for r in results)
     
     for res in results:
-        for page, count in res['top_pages']:
-            combined_accesses[page] = combined_accesses.get(page, 0) + count
+        combined_accesses.update(dict(res['top_pages']))
     
-    top_combined = sorted(combined_accesses.items(), key=lambda x: x[1], reverse=True)[:20]
+    top_combined = combined_accesses.most_common(20)
     
-    for page, count in top_combined:
-        percentage = (count / total_all_accesses) * 100
-        print(f"0x{page:08X}{'':<7} {count:>12,} {percentage:>14.2f}%")
+    _write_lines(_page_rows(top_combined, total_all_accesses))
 
     print("\n\nComparación de Políticas:")
     print("="*90)
@@ -323,6 +505,8 @@ def main():
                        help='Números de marcos a simular (default: 10 50 100)')
     parser.add_argument('--policies', nargs='+', default=['fifo', 'lru', 'opt'],
                        help='Políticas de reemplazo a evaluar (default: fifo lru opt)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Número de procesos para las simulaciones (default: núcleos disponibles)')
     
     if len(sys.argv) == 1:
         parser.print_help()
@@ -331,7 +515,7 @@ def main():
     args = parser.parse_args()
     
     print("\nIniciando simulaciones...")
-    results = run_simulations(args.trace_files, args.frames, args.policies)
+    results = run_simulations(args.trace_files, args.frames, args.policies, args.workers)
     
     if results:
         print_final_report(results)